@@ -0,0 +1,198 @@
+"""pytest setup for Warbler tests.
+
+pytest.ini runs the suite in parallel with pytest-xdist, one test file
+per worker (at most four, one for each test file), so just:
+
+    python -m pytest
+
+The main pytest process builds the empty schema once, in a template
+database (warbler-test-<run>-seed). Every process that runs tests then
+gets its own copy of it (warbler-test-<run>-gw0, -gw1, ..., or
+warbler-test-<run>-main with -n 0) through CREATE DATABASE ... TEMPLATE,
+which copies files instead of running any DDL. All of these databases are
+dropped again at the end of the run. <run> is the main process's pid, so
+two runs against the same server don't touch each other's databases, and
+a run that was killed before it could clean up has its databases dropped
+by the next one.
+
+Collecting tests (--collect-only) or asking for --help doesn't create any
+databases.
+
+For a serial run in a single process, use:
+
+    python -m pytest -n 0
+
+(not -p no:xdist: pytest.ini's options need xdist to be loaded.)
+"""
+
+import os
+import re
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from models import db
+
+TEST_DATABASE = "warbler-test"
+
+
+def server_engine():
+    """Engine for the server's postgres database, to create/drop others."""
+
+    # CREATE/DROP DATABASE can't run inside a transaction
+    return create_engine("postgresql:///postgres", isolation_level="AUTOCOMMIT")
+
+
+def run_on_server(*statements):
+    """Run each statement against the postgres database."""
+
+    engine = server_engine()
+
+    with engine.connect() as conn:
+        for statement in statements:
+            conn.execute(statement)
+
+    engine.dispose()
+
+
+def run_id():
+    """An id for this run, shared by the main process and its workers."""
+
+    # xdist workers inherit the main process's environment
+    return os.environ.setdefault('WARBLER_TEST_RUN', str(os.getpid()))
+
+
+def pid_alive(pid):
+    """Is there a process with this pid on this machine?"""
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # it exists, it just isn't ours
+        return True
+
+    return True
+
+
+def drop_stale_databases():
+    """Drop test databases whose run has died without dropping them."""
+
+    engine = server_engine()
+
+    with engine.connect() as conn:
+        names = conn.execute(
+            text("SELECT datname FROM pg_database WHERE datname LIKE :prefix"),
+            prefix=f"{TEST_DATABASE}-%").fetchall()
+
+        for (name,) in names:
+            match = re.match(rf"{TEST_DATABASE}-(\d+)-", name)
+
+            if match and not pid_alive(int(match.group(1))):
+                conn.execute(f'DROP DATABASE IF EXISTS "{name}"')
+
+    engine.dispose()
+
+
+def build_seed_database(seed_database):
+    """(Re)create the template database, holding our empty tables."""
+
+    # imported here: test_base imports app, which must wait until
+    # pytest_configure has picked this process's database
+    from test_base import schema_sql, unlogged_sql
+
+    run_on_server(f'DROP DATABASE IF EXISTS "{seed_database}"',
+                  f'CREATE DATABASE "{seed_database}"')
+
+    engine = create_engine(f"postgresql:///{seed_database}")
+
+    with engine.begin() as conn:
+        conn.execute(f"{schema_sql(conn.dialect)};\n{unlogged_sql()}")
+
+    # no one may be connected to a template while it is copied
+    engine.dispose()
+
+
+def runs_tests(config):
+    """Is this pytest process going to run tests itself?
+
+    xdist workers do; the main process only does when there are no workers.
+    """
+
+    return hasattr(config, 'workerinput') or not config.getoption('numprocesses', None)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_cmdline_main(config):
+    """Make '-n 0' a plain serial run.
+
+    pytest.ini's --dist=loadfile would otherwise still start xdist's
+    distributed session, which fails when it has no workers to hand to.
+    """
+
+    if config.getoption('numprocesses', None) == 0:
+        config.option.dist = 'no'
+
+
+def pytest_configure(config):
+    """Build the template, and this process's copy of it if it runs tests."""
+
+    # nothing will run, so there's no database to build
+    if config.option.collectonly or config.option.help:
+        return
+
+    worker = os.environ.get('PYTEST_XDIST_WORKER')
+    seed_database = f"{TEST_DATABASE}-{run_id()}-seed"
+    database = f"{TEST_DATABASE}-{run_id()}-{worker or 'main'}"
+
+    # this has to happen before anything imports test_base (and so app)
+    os.environ['TEST_DATABASE_URL'] = f"postgresql:///{database}"
+
+    # xdist workers start after the main process is configured, so the
+    # template is ready by the time they copy it
+    if not worker:
+        drop_stale_databases()
+        build_seed_database(seed_database)
+        config.warbler_seed_database = seed_database
+
+    # under xdist the main process only hands out tests; the workers run them
+    if runs_tests(config):
+        run_on_server(f'DROP DATABASE IF EXISTS "{database}"',
+                      f'CREATE DATABASE "{database}" TEMPLATE "{seed_database}"')
+        config.warbler_database = database
+
+        # a fresh copy has every table and no rows, so setup_database()
+        # doesn't need to check for tables or empty them
+        os.environ['TEST_DATABASE_FROM_TEMPLATE'] = "1"
+
+
+def pytest_unconfigure(config):
+    """Drop this process's test database, and the template once we're done."""
+
+    database = getattr(config, 'warbler_database', None)
+
+    if database:
+        if db.app is not None:
+            db.session.remove()
+            db.engine.dispose()
+
+        run_on_server(f'DROP DATABASE IF EXISTS "{database}"')
+
+    seed_database = getattr(config, 'warbler_seed_database', None)
+
+    if seed_database:
+        run_on_server(f'DROP DATABASE IF EXISTS "{seed_database}"')
+
+
+@pytest.fixture(scope='session', autouse=True)
+def schema():
+    """Finish setting up this process's copy of the test database.
+
+    By the time this runs the test modules have imported test_base (and
+    so configured app), so db is talking to that copy.
+    """
+
+    from test_base import setup_database
+
+    setup_database()
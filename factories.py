@@ -0,0 +1,58 @@
+"""Bulk sample data for Warbler tests.
+
+Each function writes all of its rows with a single INSERT ... RETURNING
+statement through db.session, so fixtures stay one round-trip per table
+no matter how many rows a test needs.
+"""
+
+from models import db, User, Message
+
+# Sample users all get the password 'testacct'. This is a real bcrypt
+# hash of it (4 rounds), baked in so no test run has to compute it;
+# logging in as a sample user still checks it with bcrypt.
+
+PASSWORD_HASH = '$2b$04$mA3MYIXw.9G1JznBYpAh7uh.vaAueH2V13C7TY7GoUaM4L/wkIfzC'
+
+
+def user_rows(n):
+    """Build rows for users testuser0 ... testuser{n-1}."""
+
+    return [{'username': f'testuser{num}', 'email': f'test{num}@hotmail.com', 'image_url': 'image.jpg'}
+            for num in range(n)]
+
+
+def insert_users(rows):
+    """Insert users and return their ids, in order.
+
+    Rows are dicts of User columns; rows without a password get the
+    hashed 'testacct' password.
+    """
+
+    rows = [{'password': PASSWORD_HASH, **row} for row in rows]
+    result = db.session.execute(
+        User.__table__.insert().values(rows).returning(User.__table__.c.id))
+
+    return [user_id for (user_id,) in result]
+
+
+def insert_messages(rows):
+    """Insert messages and return their ids, in order."""
+
+    result = db.session.execute(
+        Message.__table__.insert().values(rows).returning(Message.__table__.c.id))
+
+    return [message_id for (message_id,) in result]
+
+
+def seed_users(n):
+    """Insert n sample users and return their ids."""
+
+    return insert_users(user_rows(n))
+
+
+def seed_messages(user_ids, per_user):
+    """Insert per_user messages for each user and return their ids, in order."""
+
+    return insert_messages([{'text': f'test message {num}', 'user_id': user_id}
+                            for user_id in user_ids
+                            for num in range(per_user)])
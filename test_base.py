@@ -0,0 +1,212 @@
+"""Shared setup and base class for Warbler tests.
+
+Import this before anything that imports app: it points app at the test
+database and configures it for testing.
+"""
+
+import os
+from contextlib import contextmanager
+from unittest import TestCase
+
+from sqlalchemy import event, text
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from models import db
+
+# BEFORE we import our app, let's set an environmental variable
+# to use a different database for tests (we need to do this
+# before we import our app, since that will have already
+# connected to the database
+
+os.environ['DATABASE_URL'] = os.environ.get('TEST_DATABASE_URL', "postgresql:///warbler-test")
+
+# Hash passwords with the fewest bcrypt rounds allowed; every signup
+# and login still goes through bcrypt, just much faster
+
+os.environ['BCRYPT_LOG_ROUNDS'] = "4"
+
+
+# Now we can import app
+
+from app import app
+
+# Don't have WTForms use CSRF at all, since it's a pain to test
+
+app.config['WTF_CSRF_ENABLED'] = False
+app.config['TESTING'] = True
+
+# Every test shares its class's connection, so one pooled connection
+# (set up before the engine is first used) is all a test process needs
+
+app.config['SQLALCHEMY_POOL_SIZE'] = 1
+app.config['SQLALCHEMY_MAX_OVERFLOW'] = 0
+
+# The database is set up once per process: by the session fixture in
+# conftest.py under pytest, or by the first test case class's setUpClass
+# under unittest.
+
+_database_ready = False
+
+
+def schema_sql(dialect):
+    """All of our CREATE TABLE/INDEX statements, as one SQL script."""
+
+    statements = []
+
+    for table in db.metadata.sorted_tables:
+        statements.append(CreateTable(table))
+        statements.extend(CreateIndex(index) for index in table.indexes)
+
+    return ';\n'.join(str(stmt.compile(dialect=dialect)).strip() for stmt in statements)
+
+
+def unlogged_sql():
+    """ALTER statements making every table UNLOGGED, as one SQL script.
+
+    Unlogged tables skip the write-ahead log, which is fine for test data
+    we throw away. Tables holding foreign keys go first, since a regular
+    table can't reference an unlogged one.
+    """
+
+    return ';\n'.join(f"ALTER TABLE {table.name} SET UNLOGGED"
+                      for table in reversed(db.metadata.sorted_tables))
+
+
+def setup_database():
+    """Create empty tables, once per process."""
+
+    global _database_ready
+
+    if not _database_ready:
+        if os.environ.get('TEST_DATABASE_FROM_TEMPLATE'):
+            # conftest.py just copied the (empty) schema from its template
+            _database_ready = True
+            return
+
+        tables = [table.name for table in db.metadata.sorted_tables]
+
+        with db.engine.begin() as conn:
+            # one query to see which of our tables exist, instead of
+            # the one-per-table checks db.create_all() makes
+            existing = conn.scalar(
+                text("SELECT count(to_regclass(name)) FROM unnest(:names) AS name"),
+                names=tables)
+
+            if not existing:
+                # brand new database: build the schema in one round-trip
+                conn.execute(f"{schema_sql(conn.dialect)};\n{unlogged_sql()}")
+
+            else:
+                if existing < len(tables):
+                    db.metadata.create_all(conn)
+
+                # tests never commit rows, but clear out anything an older
+                # run left behind, all tables in one statement
+                conn.execute(f"{unlogged_sql()};\n"
+                             f"TRUNCATE {', '.join(tables)} RESTART IDENTITY CASCADE")
+
+        _database_ready = True
+
+
+@contextmanager
+def count_queries():
+    """Collect every SQL statement sent to the database inside the block.
+
+    Use this to pin down the queries a view makes, so an N+1 query
+    problem shows up as a failing test:
+
+        with count_queries() as queries:
+            resp = self.client.get('/users')
+
+        self.assertLessEqual(len(queries), 3)
+
+    Everything in db.session is expired first. Views share the test's
+    session, so otherwise they would get whatever the test already loaded
+    for free, instead of paying for it the way a fresh request does.
+    """
+
+    db.session.expire_all()
+
+    queries = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        queries.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+
+    try:
+        yield queries
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+
+def restart_savepoint(session, transaction):
+    """Re-open the test SAVEPOINT whenever a commit/rollback closes it."""
+
+    if transaction.nested and not transaction._parent.nested:
+        # expire everything, the same way a real commit would
+        session.expire_all()
+        session.begin_nested()
+
+
+class WarblerTestBase(TestCase):
+    """Run each test in a SAVEPOINT that gets rolled back afterwards.
+
+    Each class holds one connection with an open transaction, and
+    db.session is bound to it. Commits made by tests (or by our views)
+    only release the SAVEPOINT, so nothing ever reaches the database
+    and we don't need to delete rows before every test.
+
+    Sample data added in a subclass's seed() goes into the class's
+    transaction instead, underneath every test's SAVEPOINT, so it is
+    built once and shared by all of the class's tests.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        setup_database()
+
+        cls.connection = db.engine.connect()
+        cls.trans = cls.connection.begin()
+
+        cls._app_session = db.session
+        db.session = db.create_scoped_session(
+            options={'bind': cls.connection, 'binds': {}})
+
+        # one test client for the whole class; cookies are cleared
+        # after each test so no one stays logged in
+        cls.client = app.test_client()
+
+        # tearDownClass doesn't run when setUpClass raises, and the pool
+        # only has the one connection, so give it back before failing
+        try:
+            cls.seed()
+        except BaseException:
+            cls.tearDownClass()
+            raise
+
+    @classmethod
+    def seed(cls):
+        """Add the sample data every test in the class shares."""
+
+    @classmethod
+    def tearDownClass(cls):
+        db.session.remove()
+        db.session = cls._app_session
+
+        cls.trans.rollback()
+        cls.connection.close()
+
+    def setUp(self):
+        self.nested = self.connection.begin_nested()
+
+        db.session.begin_nested()
+        event.listen(db.session, 'after_transaction_end', restart_savepoint)
+
+    def tearDown(self):
+        event.remove(db.session, 'after_transaction_end', restart_savepoint)
+        db.session.close()
+
+        self.nested.rollback()
+
+        self.client.cookie_jar.clear()
@@ -5,43 +5,20 @@
 #    python -m unittest test_message_model.py
 
 
-import os
-from unittest import TestCase
+# test_base points app at the test database, so import it first
+
+from test_base import WarblerTestBase
 
 from models import db, User, Message
 from sqlalchemy.exc import DataError
 
-# BEFORE we import our app, let's set an environmental variable
-# to use a different database for tests (we need to do this
-# before we import our app, since that will have already
-# connected to the database
-
-os.environ['DATABASE_URL'] = "postgresql:///warbler-test"
-
-
-# Now we can import app
-
-from app import app
-
-# Create our tables (we do this here, so we only create the tables
-# once for all tests --- in each test, we'll delete the data
-# and create fresh new clean test data
-
-db.create_all()
-
 #Check that messages are created properly
 # check that message text is limited to 140 characters
 # check that each message has only one user
 
-class MessageModelTestCase(TestCase):
+class MessageModelTestCase(WarblerTestBase):
     '''Message model tests'''
 
-    def setUp(self):
-        User.query.delete()
-        Message.query.delete()
-
-        self.client = app.test_client()
-
     def test_message_model(self):
         '''Does basic model work?'''
 
@@ -51,15 +28,13 @@ class MessageModelTestCase(TestCase):
             password="HASHED_PASSWORD"
         )
 
-        db.session.add(user)
-        db.session.commit()
-
         message = Message(
             text='This is a test message',
-            user_id = user.id
+            user = user
         )
 
-        db.session.add(message)
+        # save user and message together, in one commit
+        db.session.add_all([user, message])
         db.session.commit()
 
         # check message values match expected values
@@ -81,16 +56,20 @@ class MessageModelTestCase(TestCase):
             password="HASHED_PASSWORD"
         )
 
+        # flush (no commit needed) to get an id for the user
         db.session.add(user)
-        db.session.commit()
+        db.session.flush()
 
         message = Message(
                 text='This is a test message. We are going to make it longer than the character limit of our message. The rest will be gibberish: jfkdsoapufhjweiofnjiadlovheriaohfnjweqifohe8i9waq7r832ic hfjidosaf6g4b39qo crhu 34i9qp74tr839b qpryhuei acghrufeiag',
                 user_id = user.id
             )
-        
-        db.session.add(message)
 
-        # String longer than 140 character will raise an error
-        self.assertRaises(DataError, db.session.commit)
-        db.session.rollback()
\ No newline at end of file
+        # String longer than 140 character won't fit in the text column
+        self.assertGreater(len(message.text), Message.__table__.c.text.type.length)
+
+        # so postgres rejects it; the failed flush only rolls back its own
+        # SAVEPOINT, leaving the test's transaction usable
+        with self.assertRaises(DataError), db.session.begin_nested():
+            db.session.add(message)
+            db.session.flush()
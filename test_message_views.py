@@ -5,61 +5,52 @@
 #    FLASK_ENV=production python -m unittest test_message_views.py
 
 
-import os
-from unittest import TestCase
+# test_base points app at the test database, so import it first
 
-from models import db, connect_db, Message, User
+from test_base import WarblerTestBase
 
-# BEFORE we import our app, let's set an environmental variable
-# to use a different database for tests (we need to do this
-# before we import our app, since that will have already
-# connected to the database
+from app import CURR_USER_KEY, g
+from factories import insert_users, insert_messages
+from models import db, Message, User
 
-os.environ['DATABASE_URL'] = "postgresql:///warbler-test"
 
+def latest_message_id(user_id):
+    '''Get the id of a user's newest message, in a single query.'''
 
-# Now we can import app
+    return (db.session
+            .query(Message.id)
+            .filter(Message.user_id == user_id)
+            .order_by(Message.id.desc())
+            .limit(1)
+            .scalar())
 
-from app import app, CURR_USER_KEY, g
 
-# Create our tables (we do this here, so we only create the tables
-# once for all tests --- in each test, we'll delete the data
-# and create fresh new clean test data
-
-db.create_all()
-
-# Don't have WTForms use CSRF at all, since it's a pain to test
-
-app.config['WTF_CSRF_ENABLED'] = False
-app.config['TESTING'] = True
-
-
-class MessageViewTestCase(TestCase):
+class MessageViewTestCase(WarblerTestBase):
     """Test views for messages."""
 
-    def setUp(self):
-        """Create test client, add sample data."""
-
-        User.query.delete()
-        Message.query.delete()
+    @classmethod
+    def seed(cls):
+        """Add sample data, once for every test in the class."""
 
-        self.client = app.test_client()
+        cls.user_ids = insert_users([
+            {'username': "testuser", 'email': "test@test.com", 'image_url': None},
+            {'username': "testuser2", 'email': "test2@test.com", 'image_url': None},
+        ])
 
-        self.testuser = User.signup(username="testuser",
-                                    email="test@test.com",
-                                    password="testuser",
-                                    image_url=None)
+        [cls.message_id] = insert_messages([{'text': 'set Up test message', 'user_id': cls.user_ids[1]}])
 
-        self.testuser2 = User.signup(username="testuser2",
-                                    email="test2@test.com",
-                                    password="testuser2",
-                                    image_url=None)
+        db.session.commit()
 
-        message = Message(text='set Up test message')
+    def setUp(self):
+        """Load the sample users."""
 
-        self.testuser2.messages.append(message)
+        super().setUp()
 
-        db.session.commit()
+        self.testuser, self.testuser2 = (User
+                                         .query
+                                         .filter(User.id.in_(self.user_ids))
+                                         .order_by(User.id)
+                                         .all())
 
     def test_add_message_get(self):
         '''Does add message return correct html'''
@@ -68,13 +59,13 @@ class MessageViewTestCase(TestCase):
                 sess[CURR_USER_KEY] = self.testuser.id
 
             resp = c.get('/messages/new')
-            html = resp.get_data(as_text=True)
+            html = resp.get_data()
 
             #check that we get an ok status code
             self.assertEqual(resp.status_code, 200)
 
             #check that html includes the add message button
-            self.assertIn('<button class="btn btn-outline-success btn-block">Add my message!</button>', html)
+            self.assertIn(b'<button class="btn btn-outline-success btn-block">Add my message!</button>', html)
 
     def test_anon_add_message(self):
         '''Does an anonymous user get redirect to home page'''
@@ -145,16 +136,17 @@ class MessageViewTestCase(TestCase):
             
             #create a message for user
             c.post('/messages/new', data={'text': 'Hello'})
-            
+            message_id = latest_message_id(self.testuser.id)
+
             #make request to get message
-            resp = c.get(f'/messages/{self.testuser.messages[0].id}')
-            html = resp.get_data(as_text=True)
+            resp = c.get(f'/messages/{message_id}')
+            html = resp.get_data()
 
             #check that we get an ok response code
             self.assertEqual(resp.status_code, 200)
 
             #check that we see the message in the html
-            self.assertIn('Hello', html)
+            self.assertIn(b'Hello', html)
 
     def test_messages_destroy(self):
         '''Can a user delete their own messages?'''
@@ -168,10 +160,10 @@ class MessageViewTestCase(TestCase):
         #check that message was created
         self.assertEqual(len(self.testuser.messages), 1)
 
-        message_id = self.testuser.messages[0].id
+        message_id = latest_message_id(self.testuser.id)
 
         #make request to delete message
-        resp = c.post(f'/messages/{self.testuser.messages[0].id}/delete')
+        resp = c.post(f'/messages/{message_id}/delete')
 
         #check that we get a redirect status code
         self.assertEqual(resp.status_code, 302)
@@ -187,7 +179,7 @@ class MessageViewTestCase(TestCase):
                 sess[CURR_USER_KEY] = self.testuser.id
 
         #make request to delete user 2 message
-        resp = c.post(f'/messages/{self.testuser2.messages[0].id}/delete')
+        resp = c.post(f'/messages/{self.message_id}/delete')
 
         #check that we get redirect status code
         self.assertEqual(resp.status_code, 302)
@@ -200,7 +192,7 @@ class MessageViewTestCase(TestCase):
         '''Can an anonymous user delete any messages?'''
         with self.client as c:
             #make request
-            resp = c.post(f'/messages/{self.testuser2.messages[0].id}/delete')
+            resp = c.post(f'/messages/{self.message_id}/delete')
 
             #check that we get redirect status code
             self.assertEqual(resp.status_code, 302)
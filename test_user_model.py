@@ -5,43 +5,18 @@
 #    python -m unittest test_user_model.py
 
 
-import os
-from unittest import TestCase
-
-from models import db, bcrypt, User, Message, Follows
-from sqlalchemy.exc import IntegrityError
-
-# BEFORE we import our app, let's set an environmental variable
-# to use a different database for tests (we need to do this
-# before we import our app, since that will have already
-# connected to the database
-
-os.environ['DATABASE_URL'] = "postgresql:///warbler-test"
+# test_base points app at the test database, so import it first
 
+from test_base import WarblerTestBase
 
-# Now we can import app
-
-from app import app
-
-# Create our tables (we do this here, so we only create the tables
-# once for all tests --- in each test, we'll delete the data
-# and create fresh new clean test data
-
-db.create_all()
+from factories import insert_users
+from models import db, bcrypt, User
+from sqlalchemy.exc import IntegrityError
 
 
-class UserModelTestCase(TestCase):
+class UserModelTestCase(WarblerTestBase):
     """Test models for user."""
 
-    def setUp(self):
-        """Create test client, add sample data."""
-
-        User.query.delete()
-        Message.query.delete()
-        Follows.query.delete()
-
-        self.client = app.test_client()
-
     def test_user_model(self):
         """Does basic model work?"""
 
@@ -83,10 +58,7 @@ class UserModelTestCase(TestCase):
             password="HASHED_PASSWORD2"
         )
 
-        db.session.add(user1)
-        db.session.add(user2)
-        db.session.commit()
-
+        db.session.add_all([user1, user2])
         user1.followers.append(user2)
         db.session.commit()
 
@@ -131,47 +103,48 @@ class UserModelTestCase(TestCase):
         # check that the user object matches the user in our database
         self.assertEqual(user1, User.query.get(user1.id))
 
-        # New user with username that already exists
-        User.signup(
-            email="test2@test.com",
-            username="testuser",
-            password="HASHED_PASSWORD2",
-            image_url = User.image_url.default.arg
-        )
+        # Each failing signup below runs in its own SAVEPOINT, which
+        # is rolled back when the error is raised
 
+        # New user with username that already exists
         # Checks that an error is raised if a user tries to
         # signup with an existing username in the database
-        self.assertRaises(IntegrityError, db.session.commit)
-        db.session.rollback()
+        with self.assertRaises(IntegrityError), db.session.begin_nested():
+            User.signup(
+                email="test2@test.com",
+                username="testuser",
+                password="HASHED_PASSWORD2",
+                image_url = User.image_url.default.arg
+            )
+            db.session.flush()
 
         # New user with null values in non-nullable fields
         # email
-        User.signup(
-            email=None,
-            username="testuser2",
-            password="HASHED_PASSWORD2",
-            image_url = User.image_url.default.arg
-        )
-        self.assertRaises(IntegrityError, db.session.commit)
-        db.session.rollback()
+        with self.assertRaises(IntegrityError), db.session.begin_nested():
+            User.signup(
+                email=None,
+                username="testuser2",
+                password="HASHED_PASSWORD2",
+                image_url = User.image_url.default.arg
+            )
+            db.session.flush()
 
         #username
-        User.signup(
-            email="test3@hotmail.com",
-            username=None,
-            password="HASHED_PASSWORD3",
-            image_url = User.image_url.default.arg
-        )
-        self.assertRaises(IntegrityError, db.session.commit)
-        db.session.rollback()
-
-        #password
+        with self.assertRaises(IntegrityError), db.session.begin_nested():
+            User.signup(
+                email="test3@hotmail.com",
+                username=None,
+                password="HASHED_PASSWORD3",
+                image_url = User.image_url.default.arg
+            )
+            db.session.flush()
+
+        #password (fails while hashing, before anything reaches the session)
         self.assertRaises(ValueError, User.signup,
                         email="test3@hotmail.com",
                         username='testuser4',
                         password=None,
                         image_url = User.image_url.default.arg)
-        db.session.rollback()
 
     def test_valid_user_authenticate(self):
         '''Does user authenticate return a valid user
@@ -192,16 +165,11 @@ class UserModelTestCase(TestCase):
         '''Does user authenticate return false
         if credentials are incorrect?'''
 
-        User.signup(
-            email="test@hotmail.com",
-            username='testuser',
-            password="HASHED_PASSWORD",
-            image_url = User.image_url.default.arg
-        )
+        insert_users([{'username': 'testuser', 'email': 'test@hotmail.com'}])
         db.session.commit()
 
         # Invalid username
-        self.assertFalse(User.authenticate('testuserbob', "HASHED_PASSWORD"))
+        self.assertFalse(User.authenticate('testuserbob', "testacct"))
 
         # Wrong password
         self.assertFalse(User.authenticate('testuser', "WRONG_PASSWORD"))
@@ -5,55 +5,30 @@
 #    python -m unittest test_user_model.py
 
 
-import os
-from unittest import TestCase
+# test_base points app at the test database, so import it first
 
-from models import db, User, Message, Follows, Likes
-from flask import g, session
-
-# BEFORE we import our app, let's set an environmental variable
-# to use a different database for tests (we need to do this
-# before we import our app, since that will have already
-# connected to the database
-
-os.environ['DATABASE_URL'] = "postgresql:///warbler-test"
-
-
-# Now we can import app
-
-from app import app, add_user_to_g, do_logout
+from test_base import WarblerTestBase, count_queries
 
-app.config['WTF_CSRF_ENABLED']=False
-app.config['TESTING'] = True
-
-# Create our tables (we do this here, so we only create the tables
-# once for all tests --- in each test, we'll delete the data
-# and create fresh new clean test data
+from app import CURR_USER_KEY
+from factories import insert_users, seed_messages, user_rows
+from flask import g, session
+from sqlalchemy.orm import selectinload
+from models import db, User, Follows, Likes
 
-db.create_all()
 
-class AnonViewsTestCase(TestCase):
+class AnonViewsTestCase(WarblerTestBase):
     '''Test user view functions with anon user page.'''
 
-    def setUp(self):
-        '''Create test client, clear database.'''
-
-        User.query.delete()
-        Message.query.delete()
-        Follows.query.delete()
-
-        self.client = app.test_client()
-
     def test_homepage(self):
         '''Does a new/anon user see the landing page + sign up button?'''
         with self.client:
             resp = self.client.get('/')
-            html = resp.get_data(as_text=True)
+            html = resp.get_data()
 
             #check http response from server
             self.assertEqual(resp.status_code, 200)
-            self.assertIn("<h1>What's Happening?</h1>", html)
-            self.assertIn('<a href="/signup" class="btn btn-primary">Sign up</a>', html)
+            self.assertIn(b"<h1>What's Happening?</h1>", html)
+            self.assertIn(b'<a href="/signup" class="btn btn-primary">Sign up</a>', html)
 
             #check that global object doesn't have a user saved
             self.assertEqual(g.user, None)
@@ -65,13 +40,13 @@ class AnonViewsTestCase(TestCase):
         '''Does the signup route provide correct html and response code?'''
         with self.client:
             resp = self.client.get('/signup')
-            html = resp.get_data(as_text=True)
+            html = resp.get_data()
 
             #check that session does not have current user
             self.assertIsNone(session.get('curr_user'))
 
             #Check that server is providing correct html
-            self.assertIn('<h2 class="join-message">Join Warbler today.</h2>', html)
+            self.assertIn(b'<h2 class="join-message">Join Warbler today.</h2>', html)
             self.assertEqual(resp.status_code, 200)
 
     def test_signup_post(self):
@@ -96,19 +71,19 @@ class AnonViewsTestCase(TestCase):
         '''Does the login route provide correct html and response code?'''
         with self.client:
             resp = self.client.get('/login')
-            html = resp.get_data(as_text=True)
+            html = resp.get_data()
 
             #check that session does not have current user
             self.assertIsNone(session.get('curr_user'))
 
             #Check that server is providing correct html
-            self.assertIn('<button class="btn btn-primary btn-block btn-lg">Log in</button>', html)
+            self.assertIn(b'<button class="btn btn-primary btn-block btn-lg">Log in</button>', html)
             self.assertEqual(resp.status_code, 200)
 
     def test_valid_login_post(self):
         '''Does login post route work with valid credentials?'''
 
-        User.signup(username='testuser', email='test@hotmail.com', password='testacct', image_url='image.jpg')
+        insert_users([{'username': 'testuser', 'email': 'test@hotmail.com'}])
         db.session.commit()
 
         with self.client:
@@ -128,12 +103,12 @@ class AnonViewsTestCase(TestCase):
 
     def test_invalid_login_post(self):
         '''Does login post route return an error with invalid credentials?'''
-        User.signup(username='testuser', email='test@hotmail.com', password='testacct', image_url='image.jpg')
+        insert_users([{'username': 'testuser', 'email': 'test@hotmail.com'}])
         db.session.commit()
 
         with self.client:
             resp = self.client.post('/login', data={'username': 'testuser', 'password': 'wrongpass'})
-            html = resp.get_data(as_text=True)
+            html = resp.get_data()
 
             #check that session does not have a current user
             self.assertIsNone(session.get('curr_user'))
@@ -142,190 +117,177 @@ class AnonViewsTestCase(TestCase):
             self.assertEqual(resp.status_code, 200)
 
             #check that server sends user back to login page
-            self.assertIn('<button class="btn btn-primary btn-block btn-lg">Log in</button>', html)
+            self.assertIn(b'<button class="btn btn-primary btn-block btn-lg">Log in</button>', html)
 
 
 
-class UserViewsTestCase(TestCase):
-    '''Test user view functions with logged in user.'''
-
-    def setUp(self):
-        '''Create test client, add sample data'''
+class SampleUsersTestCase(WarblerTestBase):
+    '''Base for user view tests: main_user, who they follow, and their messages.'''
 
-        User.query.delete()
-        Message.query.delete()
-        Follows.query.delete()
-        Likes.query.delete()
+    @classmethod
+    def seed(cls):
+        '''Add sample data, once for every test in the class'''
 
-        self.client = app.test_client()
+        main_user = {'username': 'testuser', 'email': 'test@hotmail.com', 'image_url': 'image.jpg'}
 
-        users = [User.signup(username=f'testuser{num}', email=f'test{num}@hotmail.com', password='testacct', image_url='image.jpg')for num in range(5)]
+        *user_ids, main_user_id = insert_users(user_rows(5) + [main_user])
 
-        main_user = User.signup(username='testuser', email='test@hotmail.com', password='testacct', image_url='image.jpg')
+        #every other user follows main_user, main_user follows one other user
+        follows = [{'user_being_followed_id': main_user_id, 'user_following_id': user_id} for user_id in user_ids]
+        follows.append({'user_being_followed_id': user_ids[1], 'user_following_id': main_user_id})
+        db.session.execute(Follows.__table__.insert().values(follows))
 
-        #for user in users, append to user.following
-        for follower in users:
-            main_user.followers.append(follower)
+        #generate messages for main_user, who likes the first one
+        message_ids = seed_messages([main_user_id], 5)
+        db.session.execute(Likes.__table__.insert().values([{'user_id': main_user_id, 'message_id': message_ids[0]}]))
 
-        #main_user follows one other user
-        main_user.following.append(users[1])
-
-        #generate messages for main_user
-        main_user.messages = [Message(text=f'test message {num}', user_id = main_user.id) for num in range(5)]
-        main_user.likes.append(main_user.messages[0])
-        
         db.session.commit()
 
-        self.user=main_user
-    
-    def tearDown(self):
-        db.session.rollback()
+        #keep the id, not the object: the session is closed after each test
+        cls.main_user_id = main_user_id
 
-    def test_do_logout(self):
-        '''Does logout route log out user from session?'''
 
-        with self.client as client: 
-            client.post('/login', data={'username': 'testuser', 'password': 'testacct'})   
+class UserViewsTestCase(SampleUsersTestCase):
+    '''Test user view functions with logged in user.'''
 
-            #check that there is a user in the session
-            self.assertIsNotNone(session.get('curr_user'))
-            
-            #make request to logout
-            resp = client.get('/logout')
+    def setUp(self):
+        '''Load main_user, with the collections our tests check, and log in as them'''
 
-            # print(resp.data)
-            #check resp status code is redirect
-            self.assertEqual(resp.status_code, 302)
+        super().setUp()
 
-            #check that current user removed from session
-            self.assertIsNone(session.get('curr_user'))
+        #one batched SELECT per collection, instead of a lazy load on each access
+        self.user = (User
+                     .query
+                     .options(selectinload(User.followers),
+                              selectinload(User.following),
+                              selectinload(User.messages))
+                     .get(self.main_user_id))
+
+        #set the session directly, skipping the login form and its bcrypt
+        #check; LoggedOutUserViewsTestCase still logs in through the form
+        with self.client.session_transaction() as sess:
+            sess[CURR_USER_KEY] = self.user.id
 
     def test_list_users(self):
         '''Does list users route return a page with a list of users'''
         with self.client:
-            self.client.post('/login', data={'username': 'testuser', 'password': 'testacct'})
+            with count_queries() as queries:
+                resp = self.client.get('/users')
+            html = resp.get_data()
 
-            resp = self.client.get('/users')
-            html = resp.get_data(as_text=True)
+            #check that the page didn't set off an N+1 query problem:
+            #g.user, the users, and g.user.following for the follow buttons
+            self.assertLessEqual(len(queries), 3)
 
             #check that correct status code was sent
             self.assertEqual(resp.status_code, 200)
 
             #check that user cards are apperaing
-            self.assertIn('<div class="card user-card">', html)
+            self.assertIn(b'<div class="card user-card">', html)
 
             #check that unfollow button appears on followed user
-            self.assertIn(f'<form method="POST" action="/users/stop-following/{self.user.following[0].id}">', html)
+            self.assertIn(f'<form method="POST" action="/users/stop-following/{self.user.following[0].id}">'.encode(), html)
 
             #check that follow button appears on unfollowed user
-            self.assertIn(f'<form method="POST" action="/users/follow/{self.user.followers[2].id}">', html)
+            self.assertIn(f'<form method="POST" action="/users/follow/{self.user.followers[2].id}">'.encode(), html)
 
     def test_list_users_with_search(self):
         '''Does list users route return a page with correct user after search'''
         with self.client:
-            self.client.post('/login', data={'username': 'testuser', 'password': 'testacct'})
+            with count_queries() as queries:
+                resp = self.client.get('/users?q=1')
+            html = resp.get_data()
 
-            resp = self.client.get('/users?q=1')
-            html = resp.get_data(as_text=True)
+            #check that the page didn't set off an N+1 query problem:
+            #g.user, the matching users, and g.user.following for the follow buttons
+            self.assertLessEqual(len(queries), 3)
 
             #check that correct status code was sent
             self.assertEqual(resp.status_code, 200)
 
             #check that user cards are apperaing
-            self.assertIn('<div class="card user-card">', html)
+            self.assertIn(b'<div class="card user-card">', html)
 
             #check that unfollow button appears on followed user
-            self.assertIn(f'<form method="POST" action="/users/stop-following/{self.user.following[0].id}">', html)
+            self.assertIn(f'<form method="POST" action="/users/stop-following/{self.user.following[0].id}">'.encode(), html)
 
             # #check that follow button appears on unfollowed user
-            self.assertNotIn(f'<form method="POST" action="/users/follow/{self.user.followers[2].id}">', html)
+            self.assertNotIn(f'<form method="POST" action="/users/follow/{self.user.followers[2].id}">'.encode(), html)
 
     def test_users_show(self):
         '''Does the user profile page show everything from our user?'''
         with self.client:
-            self.client.post('/login', data={'username': 'testuser', 'password': 'testacct'})
+            with count_queries() as queries:
+                resp = self.client.get(f'/users/{self.user.id}')
+            html = resp.get_data()
 
-            resp = self.client.get(f'/users/{self.user.id}')
-            html = resp.get_data(as_text=True)
+            #check that the page didn't set off an N+1 query problem:
+            #g.user (also the profile's user), their messages, and one count each
+            #of messages, following, followers and likes in the sidebar
+            self.assertLessEqual(len(queries), 6)
 
             #check for correct status code
             self.assertEqual(resp.status_code, 200)
 
             #check that header image shows
-            self.assertIn(f'<img class="img-fluid" src="{self.user.header_image_url}"', html)
+            self.assertIn(f'<img class="img-fluid" src="{self.user.header_image_url}"'.encode(), html)
 
             #check that html shows users messages
-            self.assertIn(f'<a href="/messages/{ self.user.messages[0].id }" class="message-link"></a>', html)
+            self.assertIn(f'<a href="/messages/{ self.user.messages[0].id }" class="message-link"></a>'.encode(), html)
 
             #check that html has correct users message text
-            self.assertIn(f'<p>{self.user.messages[0].text}</p>', html)
+            self.assertIn(f'<p>{self.user.messages[0].text}</p>'.encode(), html)
 
     def test_user_show_following(self):
         '''Does the server show the users the accounts they follow?'''
         with self.client:
-            self.client.post('/login', data={'username': 'testuser', 'password': 'testacct'})
+            with count_queries() as queries:
+                resp = self.client.get(f'/users/{self.user.id}/following')
+            html = resp.get_data()
 
-            resp = self.client.get(f'/users/{session["curr_user"]}/following')
-            html = resp.get_data(as_text=True)
+            #check that the page didn't set off an N+1 query problem:
+            #g.user (also the profile's user), and one query each for messages,
+            #following, followers and likes; the cards reuse following
+            self.assertLessEqual(len(queries), 5)
 
             #check for correct status code
             self.assertEqual(resp.status_code, 200)
 
             #check that users following displays
-            self.assertIn(f'<a href="/users/{self.user.following[0].id}" class="card-link">', html)
+            self.assertIn(f'<a href="/users/{self.user.following[0].id}" class="card-link">'.encode(), html)
 
             #check that the unfollow button appears
-            self.assertIn(f'<form method="POST" action="/users/stop-following/{self.user.following[0].id}">', html)
-
-    def test_anon_show_following(self):
-        '''Does the show following work when there is no logged in user?'''
-        with self.client:
-
-            resp = self.client.get(f'/users/{self.user.id}/following')
-
-            #check if we get a redirect
-            self.assertEqual(resp.status_code, 302)
-
-            #check the location of the redirect
-            self.assertEqual(resp.location, 'http://localhost/')
+            self.assertIn(f'<form method="POST" action="/users/stop-following/{self.user.following[0].id}">'.encode(), html)
 
     def test_user_followers(self):
         '''Does the server show users their followers?'''
         with self.client:
-            self.client.post('/login', data={'username': 'testuser', 'password': 'testacct'})
+            with count_queries() as queries:
+                resp = self.client.get(f'/users/{self.user.id}/followers')
+            html = resp.get_data()
 
-            resp = self.client.get(f'/users/{session["curr_user"]}/followers')
-            html = resp.get_data(as_text=True)
+            #check that the page didn't set off an N+1 query problem:
+            #g.user (also the profile's user), and one query each for messages,
+            #following, followers and likes; the cards reuse both lists
+            self.assertLessEqual(len(queries), 5)
 
             #check for correct status code
             self.assertEqual(resp.status_code, 200)
 
             #check that users following displays
-            self.assertIn(f'<a href="/users/{self.user.followers[0].id}" class="card-link">', html)
+            self.assertIn(f'<a href="/users/{self.user.followers[0].id}" class="card-link">'.encode(), html)
 
             #check that the unfollow button appears
-            self.assertIn(f'<form method="POST" action="/users/stop-following/{self.user.following[0].id}">', html)
+            self.assertIn(f'<form method="POST" action="/users/stop-following/{self.user.following[0].id}">'.encode(), html)
 
             #check that the follow button appears
-            self.assertIn(f'<form method="POST" action="/users/follow/{self.user.followers[3].id}">', html)
-
-    def test_anon_user_followers(self):
-        '''Does the show followers work when there is no logged in user?'''
-        with self.client:
-
-            resp = self.client.get(f'/users/{self.user.id}/followers')
-
-            #check if we get a redirect
-            self.assertEqual(resp.status_code, 302)
-
-            #check the location of the redirect
-            self.assertEqual(resp.location, 'http://localhost/')
+            self.assertIn(f'<form method="POST" action="/users/follow/{self.user.followers[3].id}">'.encode(), html)
 
     def test_add_follow(self):
         with self.client:
-            self.client.post('/login', data={'username': 'testuser', 'password': 'testacct'})
-
-            user_to_follow = User.query.filter(User != self.user, User not in self.user.following).first()
+            #any user other than main_user that main_user doesn't follow yet
+            following_ids = [user.id for user in self.user.following] + [self.user.id]
+            user_to_follow = User.query.filter(~User.id.in_(following_ids)).first()
 
             resp = self.client.post(f'/users/follow/{user_to_follow.id}')
 
@@ -341,21 +303,8 @@ class UserViewsTestCase(TestCase):
             #check that the user to follow is in the users following list
             self.assertIn(user_to_follow, self.user.following)
 
-    def test_anon_add_follow(self):
-        with self.client:
-
-            resp = self.client.post(f'/users/follow/3')
-
-            #check if we get a redirect
-            self.assertEqual(resp.status_code, 302)
-
-            #check the location of the redirect
-            self.assertEqual(resp.location, 'http://localhost/')
-
     def test_stop_following(self):
          with self.client:
-            self.client.post('/login', data={'username': 'testuser', 'password': 'testacct'})
-
             resp = self.client.post(f'/users/stop-following/{self.user.following[0].id}')
 
             #check for redirect
@@ -367,54 +316,27 @@ class UserViewsTestCase(TestCase):
             #check that user following increased
             self.assertEqual(len(self.user.following), 0)
 
-    def test_anon_stop_following(self):
-        with self.client:
-
-            resp = self.client.post(f'/users/stop-following/3')
-
-            #check if we get a redirect
-            self.assertEqual(resp.status_code, 302)
-
-            #check the location of the redirect
-            self.assertEqual(resp.location, 'http://localhost/')
-
     def test_edit_profile_get(self):
         with self.client:
-            self.client.post('/login', data={'username': 'testuser', 'password': 'testacct'})
-
             resp = self.client.get('/users/profile')
-            html = resp.get_data(as_text=True)
+            html = resp.get_data()
 
             #check that we get an ok status code
             self.assertEqual(resp.status_code, 200)
 
             #check that we get the correct html
-            self.assertIn('<form method="POST" id="user_form">', html)
+            self.assertIn(b'<form method="POST" id="user_form">', html)
 
             #check that the html contains fields
-            self.assertIn('id="username" name="username"', html)
+            self.assertIn(b'id="username" name="username"', html)
 
             #check that the form fields are auto populated
-            self.assertIn(self.user.username, html)
-
-    def test_anon_edit_profile_get(self):
-        with self.client:
-
-            resp = self.client.get('/users/profile')
+            self.assertIn(self.user.username.encode(), html)
 
-            #check if we get a redirect
-            self.assertEqual(resp.status_code, 302)
-
-            #check the location of the redirect
-            self.assertEqual(resp.location, 'http://localhost/')
-        
     def test_edit_profile_post(self):
         with self.client:
-            self.client.post('/login', data={'username': 'testuser', 'password': 'testacct'})
-
             data = {'username': 'new_username', 'password': 'testacct', 'bio': 'test user bio', 'image_url': 'image.jpg', 'header_image_url': 'header.jpg'}
             resp = self.client.post('/users/profile', data=data)
-            html = resp.get_data(as_text=True)
 
             #check that we get redirect status code
             self.assertEqual(resp.status_code, 302)
@@ -426,21 +348,8 @@ class UserViewsTestCase(TestCase):
             self.assertEqual(self.user.username, data['username'])
             self.assertEqual(self.user.bio, data['bio'])
 
-    def test_anon_edit_profile_post(self):
-        with self.client:
-
-            resp = self.client.post('/users/profile')
-
-            #check if we get a redirect
-            self.assertEqual(resp.status_code, 302)
-
-            #check the location of the redirect
-            self.assertEqual(resp.location, 'http://localhost/')
-
     def test_delete_user(self):
         with self.client:
-            self.client.post('/login', data={'username': 'testuser', 'password': 'testacct'})
-
             resp = self.client.post('/users/delete')
 
             #check that we get redirect status code
@@ -455,21 +364,8 @@ class UserViewsTestCase(TestCase):
             #check to see that user is deleted from database
             self.assertIsNone(User.query.get(self.user.id))
 
-    def test_anon_delete_user(self):
-        with self.client:
-
-            resp = self.client.post('/users/delete')
-
-            #check if we get a redirect
-            self.assertEqual(resp.status_code, 302)
-
-            #check the location of the redirect
-            self.assertEqual(resp.location, 'http://localhost/')
-
     def test_add_liked_message(self):
         with self.client:
-            self.client.post('/login', data={'username': 'testuser', 'password': 'testacct'})
-
             resp = self.client.post(f'/users/add_like/{self.user.messages[1].id}')
 
             #check that we get a redirect status code
@@ -484,21 +380,8 @@ class UserViewsTestCase(TestCase):
             #check that the new message has a like
             self.assertEqual(len(self.user.messages[1].likes), 1)
 
-    def test_anon_add_liked_message(self):
-        with self.client:
-
-            resp = self.client.post('/users/add_like/3')
-
-            #check if we get a redirect
-            self.assertEqual(resp.status_code, 302)
-
-            #check the location of the redirect
-            self.assertEqual(resp.location, 'http://localhost/')
-
     def test_remove_liked_message(self):
         with self.client:
-            self.client.post('/login', data={'username': 'testuser', 'password': 'testacct'})
-
             resp = self.client.post(f'/users/remove_like/{self.user.messages[0].id}')
 
             #check that we get a redirect status code
@@ -513,36 +396,128 @@ class UserViewsTestCase(TestCase):
             #check that the message has no likes
             self.assertEqual(len(self.user.messages[0].likes), 0)
 
-    def test_anon_remove_liked_message(self):
+    def test_show_user_likes(self):
         with self.client:
+            resp = self.client.get(f'/users/{self.user.id}/likes')
+            html = resp.get_data()
+
+            #check that we get an ok status code
+            self.assertEqual(resp.status_code, 200)
+
+            #check that html contains messages user likes
+            self.assertIn(self.user.likes[0].text.encode(), html)
 
-            resp = self.client.post('/users/remove_like/3')
 
-            #check if we get a redirect
+class LoggedOutUserViewsTestCase(SampleUsersTestCase):
+    '''Test user view functions with no user logged in.'''
+
+    def test_do_logout(self):
+        '''Does logout route log out user from session?'''
+
+        with self.client as client: 
+            client.post('/login', data={'username': 'testuser', 'password': 'testacct'})   
+
+            #check that there is a user in the session
+            self.assertIsNotNone(session.get('curr_user'))
+            
+            #make request to logout
+            resp = client.get('/logout')
+
+            # print(resp.data)
+            #check resp status code is redirect
             self.assertEqual(resp.status_code, 302)
 
-            #check the location of the redirect
-            self.assertEqual(resp.location, 'http://localhost/')
+            #check that current user removed from session
+            self.assertIsNone(session.get('curr_user'))
 
-    def test_show_user_likes(self):
-        with self.client:
-            self.client.post('/login', data={'username': 'testuser', 'password': 'testacct'})
+    def test_anon_show_following(self):
+        '''Does the show following work when there is no logged in user?'''
+        resp = self.client.get(f'/users/{self.main_user_id}/following')
 
-            resp = self.client.get(f'/users/{self.user.id}/likes')
-            html = resp.get_data(as_text=True)
+        #check if we get a redirect
+        self.assertEqual(resp.status_code, 302)
 
-            #check that we get an ok status code
-            self.assertEqual(resp.status_code, 200)
+        #check the location of the redirect
+        self.assertEqual(resp.location, 'http://localhost/')
 
-            #check that html contains messages user likes
-            self.assertIn(self.user.likes[0].text, html)
+    def test_anon_user_followers(self):
+        '''Does the show followers work when there is no logged in user?'''
+        resp = self.client.get(f'/users/{self.main_user_id}/followers')
+
+        #check if we get a redirect
+        self.assertEqual(resp.status_code, 302)
+
+        #check the location of the redirect
+        self.assertEqual(resp.location, 'http://localhost/')
+
+    def test_anon_add_follow(self):
+        resp = self.client.post(f'/users/follow/3')
+
+        #check if we get a redirect
+        self.assertEqual(resp.status_code, 302)
+
+        #check the location of the redirect
+        self.assertEqual(resp.location, 'http://localhost/')
+
+    def test_anon_stop_following(self):
+        resp = self.client.post(f'/users/stop-following/3')
+
+        #check if we get a redirect
+        self.assertEqual(resp.status_code, 302)
+
+        #check the location of the redirect
+        self.assertEqual(resp.location, 'http://localhost/')
+
+    def test_anon_edit_profile_get(self):
+        resp = self.client.get('/users/profile')
+
+        #check if we get a redirect
+        self.assertEqual(resp.status_code, 302)
+
+        #check the location of the redirect
+        self.assertEqual(resp.location, 'http://localhost/')
+
+    def test_anon_edit_profile_post(self):
+        resp = self.client.post('/users/profile')
+
+        #check if we get a redirect
+        self.assertEqual(resp.status_code, 302)
+
+        #check the location of the redirect
+        self.assertEqual(resp.location, 'http://localhost/')
+
+    def test_anon_delete_user(self):
+        resp = self.client.post('/users/delete')
+
+        #check if we get a redirect
+        self.assertEqual(resp.status_code, 302)
+
+        #check the location of the redirect
+        self.assertEqual(resp.location, 'http://localhost/')
+
+    def test_anon_add_liked_message(self):
+        resp = self.client.post('/users/add_like/3')
+
+        #check if we get a redirect
+        self.assertEqual(resp.status_code, 302)
+
+        #check the location of the redirect
+        self.assertEqual(resp.location, 'http://localhost/')
+
+    def test_anon_remove_liked_message(self):
+        resp = self.client.post('/users/remove_like/3')
+
+        #check if we get a redirect
+        self.assertEqual(resp.status_code, 302)
+
+        #check the location of the redirect
+        self.assertEqual(resp.location, 'http://localhost/')
 
     def test_anon_show_user_likes(self):
-        with self.client:
-            resp = self.client.get(f'/users/{self.user.id}/likes')
+        resp = self.client.get(f'/users/{self.main_user_id}/likes')
 
-            #check if we get a redirect
-            self.assertEqual(resp.status_code, 302)
+        #check if we get a redirect
+        self.assertEqual(resp.status_code, 302)
 
-            #check the location of the redirect
-            self.assertEqual(resp.location, 'http://localhost/')
\ No newline at end of file
+        #check the location of the redirect
+        self.assertEqual(resp.location, 'http://localhost/')